@@ -1,9 +1,15 @@
+from functools import cached_property
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DEBUG: bool = False
     FETCH_INTERVAL_HOURS: int = 24
+    CLEANUP_HOUR_UTC: int = 3
+    RETENTION_DAYS: int = 14
+    SHUTDOWN_TIMEOUT_SECONDS: int = 10
+    SCHEDULER_LOCK_FILE: str = "./scheduler.lock"
     DATABASE_URL: str = "sqlite+aiosqlite:///./news.db"
     CORS_ORIGINS: str = "http://localhost:5173"
     LOG_LEVEL: str = "INFO"
@@ -19,9 +25,9 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> list[str]:
-        """Parse CORS_ORIGINS as comma-separated list."""
+        """Parse CORS_ORIGINS as comma-separated list (once, on first access)."""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
 
@@ -1,10 +1,43 @@
+from sqlalchemy import event, make_url
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateIndex, CreateTable
 from typing import AsyncGenerator
 
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+# A server database (Postgres) may drop connections left idle between the
+# scheduled jobs; test them on checkout and replace them before they go stale
+# instead of failing the first query after a quiet spell
+if make_url(settings.DATABASE_URL).get_backend_name() == "sqlite":
+    ENGINE_OPTIONS = {}
+else:
+    ENGINE_OPTIONS = {"pool_pre_ping": True, "pool_recycle": 1800}
+
+engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG, **ENGINE_OPTIONS)
+
+# WAL lets feed reads proceed while the scheduler writes; the larger page
+# cache and mmap keep hot pages in memory instead of going through read()
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-65536",  # 64 MB
+    "PRAGMA temp_store=MEMORY",
+]
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+# Dialect INSERT constructs supporting ON CONFLICT DO NOTHING
+DIALECT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -13,12 +46,36 @@ class Base(DeclarativeBase):
     pass
 
 
+def _create_missing_tables(conn) -> None:
+    """Create model tables that don't exist yet, e.g. ones added since the last deploy.
+
+    Like create_all, but with IF NOT EXISTS so workers starting together
+    can't both decide to create the same table.
+    """
+    for table in Base.metadata.sorted_tables:
+        conn.execute(CreateTable(table, if_not_exists=True))
+
+
+def _create_missing_indexes(conn) -> None:
+    """Create indexes added to models after their table already existed.
+
+    Every worker runs this at startup, so let the database skip existing
+    indexes (IF NOT EXISTS) rather than checking first: two workers can
+    both see an index as missing and the second CREATE would fail.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def init_db() -> None:
     """Create all database tables."""
-    from app.models import Article  # noqa: F401
+    from app.models import Article, RatingCache  # noqa: F401
 
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_tables)
+        # Existing tables don't get indexes added to the model later
+        await conn.run_sync(_create_missing_indexes)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -1,13 +1,15 @@
+import hashlib
 import logging
 import sys
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.database import init_db
 from app.routers import articles_router
+from app.services.article_rater import get_rater
 from app.utils.scheduler import start_scheduler, shutdown_scheduler
 
 # Configure logging for production
@@ -22,16 +24,42 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    get_rater().warmup()
     start_scheduler()
     logger.info("Application startup complete")
     yield
-    shutdown_scheduler()
+    await shutdown_scheduler()
     logger.info("Application shutdown complete")
 
 
 app = FastAPI(title="Bright World News API", lifespan=lifespan)
 app.include_router(articles_router, prefix="/api")
 
+
+# Registered before CORS so CORS headers are still added to 304 responses
+@app.middleware("http")
+async def etag_middleware(request: Request, call_next):
+    """Tag article GET responses and answer 304 if the client's copy is current."""
+    response = await call_next(request)
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or not request.url.path.startswith("/api/articles")
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    headers = dict(response.headers)
+    headers["ETag"] = etag
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
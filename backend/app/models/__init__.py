@@ -1,3 +1,4 @@
 from app.models.article import Article
+from app.models.rating_cache import RatingCache
 
-__all__ = ["Article"]
+__all__ = ["Article", "RatingCache"]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Text, Integer, Boolean, DateTime, Index
+from sqlalchemy import String, Text, Integer, Boolean, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -27,4 +27,28 @@ class Article(Base):
     __table_args__ = (
         Index("ix_articles_published_at", "published_at"),
         Index("ix_articles_guid", "guid"),
+        # Feed query: filter on is_rated + score threshold, then sort by date
+        Index("ix_articles_feed", "is_rated", "hopefulness_score", "published_at"),
+        # Category/region filters and counts only ever look at rated articles
+        Index(
+            "ix_articles_category_feed",
+            "category",
+            "hopefulness_score",
+            sqlite_where=text("is_rated = 1"),
+            postgresql_where=text("is_rated"),
+        ),
+        Index(
+            "ix_articles_region_feed",
+            "region",
+            "hopefulness_score",
+            sqlite_where=text("is_rated = 1"),
+            postgresql_where=text("is_rated"),
+        ),
+        # Rating retry job scans only the small set of pending articles
+        Index(
+            "ix_articles_pending_rating",
+            "published_at",
+            sqlite_where=text("rating_failed = 1"),
+            postgresql_where=text("rating_failed"),
+        ),
     )
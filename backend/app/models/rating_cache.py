@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class RatingCache(Base):
+    __tablename__ = "rating_cache"
+
+    # sha256 of prompt version + article title/summary/source
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    excluded_reason: Mapped[str | None] = mapped_column(String, nullable=True)
+    rationale: Mapped[str] = mapped_column(Text, default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Cleanup job expires entries by age
+        Index("ix_rating_cache_created_at", "created_at"),
+    )
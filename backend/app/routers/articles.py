@@ -1,17 +1,28 @@
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import and_, case, lambda_stmt, or_, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from app.config import settings
 from app.database import get_session
 from app.models import Article
-from app.schemas import ArticleResponse, ArticleListResponse, CategoryCount, RegionCount
+from app.schemas import ArticleCursor, ArticleResponse, ArticleListResponse, CategoryCount, RegionCount
 from app.services.news_fetcher import fetch_and_store
 from app.services.guardian_fetcher import get_guardian_usage
 from app.services.thenewsapi_fetcher import get_thenewsapi_usage
 from app.services.article_rater import get_gemini_usage
+from app.utils.cache import get_cached, set_cached
+from app.utils.dates import current_day
+
+# Writes only invalidate the cache in the worker that made them (the one
+# running the scheduler), so keep entries short-lived: other workers, and
+# hourly rating retries, show up in counts within a minute
+CACHE_TTL_SECONDS = 60
+
+# Feed rows are selected as plain columns, skipping ORM instance hydration
+ARTICLE_RESPONSE_COLUMNS = [getattr(Article, name) for name in ArticleResponse.model_fields]
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
@@ -23,47 +34,86 @@ async def get_articles(
     category: str | None = Query(default=None),
     region: str | None = Query(default=None),
     min_score: int = Query(default=None, ge=0, le=100),
+    after_published_at: datetime | None = Query(default=None),
+    after_id: int | None = Query(default=None),
     session: AsyncSession = Depends(get_session),
 ):
-    """Fetch paginated articles filtered by rating score."""
+    """Fetch paginated articles filtered by rating score.
+
+    Pages can be requested by offset, or by passing the previous page's
+    next_cursor as after_published_at/after_id (keyset pagination), which
+    stays fast regardless of how deep the page is.
+    """
     # Use default threshold if not specified
     score_threshold = min_score if min_score is not None else settings.RATING_THRESHOLD
 
-    # Build base query: only rated articles above threshold
-    base_query = select(Article).where(
-        Article.is_rated == True,
-        Article.hopefulness_score >= score_threshold,
+    # Get total count with filters (counted directly, no subquery)
+    count_query = _filter_feed(
+        lambda_stmt(lambda: select(func.count(Article.id))), score_threshold, category, region
     )
-
-    if category:
-        base_query = base_query.where(Article.category == category)
-    if region:
-        base_query = base_query.where(Article.region == region)
-
-    # Get total count with filters
-    count_query = select(func.count()).select_from(base_query.subquery())
     count_result = await session.execute(count_query)
     total = count_result.scalar_one()
 
-    # Get articles sorted by published date (newest first)
-    query = (
-        base_query
-        .order_by(Article.published_at.desc())
-        .offset(offset)
-        .limit(limit)
+    # Get articles sorted by published date (newest first), undated last
+    query = _filter_feed(
+        lambda_stmt(lambda: select(*ARTICLE_RESPONSE_COLUMNS)), score_threshold, category, region
     )
+    if after_id is None:
+        query += lambda s: s.offset(offset)
+    elif after_published_at is None:
+        # Cursor is already among the undated articles, which sort last
+        query += lambda s: s.where(Article.published_at.is_(None), Article.id < after_id)
+    else:
+        query += lambda s: s.where(or_(
+            Article.published_at < after_published_at,
+            and_(Article.published_at == after_published_at, Article.id < after_id),
+            Article.published_at.is_(None),
+        ))
+    # One extra row tells us whether another page exists
+    page_size = limit + 1
+    query += lambda s: s.order_by(
+        Article.published_at.desc().nulls_last(), Article.id.desc()
+    ).limit(page_size)
     result = await session.execute(query)
-    articles = result.scalars().all()
+    articles = result.all()
+
+    has_more = len(articles) > limit
+    articles = articles[:limit]
+    next_cursor = None
+    if has_more:
+        last = articles[-1]
+        next_cursor = ArticleCursor(published_at=last.published_at, id=last.id)
 
     return ArticleListResponse(
         articles=articles,
         total=total,
         limit=limit,
         offset=offset,
-        has_more=offset + len(articles) < total,
+        has_more=has_more,
+        next_cursor=next_cursor,
     )
 
 
+def _filter_feed(
+    stmt: StatementLambdaElement,
+    score_threshold: int,
+    category: str | None,
+    region: str | None,
+) -> StatementLambdaElement:
+    """Restrict a feed statement to displayed articles and optional filters.
+
+    Each filter is its own lambda, so every combination gets its own cached
+    SQL and the filter values become bound parameters.
+    """
+    # Only rated articles above threshold
+    stmt += lambda s: s.where(Article.is_rated == True, Article.hopefulness_score >= score_threshold)
+    if category:
+        stmt += lambda s: s.where(Article.category == category)
+    if region:
+        stmt += lambda s: s.where(Article.region == region)
+    return stmt
+
+
 @router.post("/fetch")
 async def trigger_fetch(session: AsyncSession = Depends(get_session)):
     """Trigger fetching articles from all RSS sources."""
@@ -82,124 +132,115 @@ async def trigger_retry_ratings():
 @router.get("/categories", response_model=list[CategoryCount])
 async def get_categories(session: AsyncSession = Depends(get_session)):
     """Return list of categories with counts of displayed articles only."""
-    query = (
-        select(Article.category, func.count(Article.id).label("count"))
-        .where(
-            Article.category.isnot(None),
-            Article.is_rated == True,
-            Article.hopefulness_score >= settings.RATING_THRESHOLD,
-        )
-        .group_by(Article.category)
-        .order_by(func.count(Article.id).desc())
-    )
-    result = await session.execute(query)
-    rows = result.all()
-
-    return [CategoryCount(name=row.category, count=row.count) for row in rows]
+    categories = get_cached("categories")
+    if categories is None:
+        rows = await _count_by(session, Article.category, min_score=settings.RATING_THRESHOLD)
+        categories = [CategoryCount(name=name, count=count) for name, count in rows]
+        set_cached("categories", categories, CACHE_TTL_SECONDS)
+    return categories
 
 
 @router.get("/regions", response_model=list[RegionCount])
 async def get_regions(session: AsyncSession = Depends(get_session)):
     """Return list of regions with counts of displayed articles only."""
-    query = (
-        select(Article.region, func.count(Article.id).label("count"))
-        .where(
-            Article.region.isnot(None),
-            Article.is_rated == True,
-            Article.hopefulness_score >= settings.RATING_THRESHOLD,
-        )
-        .group_by(Article.region)
-        .order_by(func.count(Article.id).desc())
-    )
+    regions = get_cached("regions")
+    if regions is None:
+        rows = await _count_by(session, Article.region, min_score=settings.RATING_THRESHOLD)
+        regions = [RegionCount(name=name, count=count) for name, count in rows]
+        set_cached("regions", regions, CACHE_TTL_SECONDS)
+    return regions
+
+
+async def _count_by(
+    session: AsyncSession, column, min_score: int | None = None
+) -> list[tuple[str, int]]:
+    """Count articles per value of a column, most common first.
+
+    With min_score, only displayed articles are counted; the is_rated
+    comparison is left to the dialect (`is_rated = 1` on SQLite) so it
+    matches the partial indexes' WHERE clause.
+    """
+    count = func.count(Article.id)
+    query = select(column, count).where(column.isnot(None)).group_by(column).order_by(count.desc())
+    if min_score is not None:
+        query = query.where(Article.is_rated == True, Article.hopefulness_score >= min_score)
     result = await session.execute(query)
-    rows = result.all()
+    return result.tuples().all()
 
-    return [RegionCount(name=row.region, count=row.count) for row in rows]
 
-
-@router.get("/stats")
+@router.get("/stats", response_model=dict)
 async def get_stats(session: AsyncSession = Depends(get_session)):
     """Return comprehensive statistics for monitoring and testing."""
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # Total count
-    total_result = await session.execute(select(func.count(Article.id)))
-    total_count = total_result.scalar_one()
-
-    # Count by rating status
-    rated_result = await session.execute(
-        select(func.count(Article.id)).where(Article.is_rated == True)
-    )
-    rated_count = rated_result.scalar_one()
+    # Article counts are cached per UTC day; API usage below is always live
+    cache_key = ("stats", current_day())
+    article_stats = get_cached(cache_key)
+    if article_stats is None:
+        article_stats = await _article_stats(session)
+        set_cached(cache_key, article_stats, CACHE_TTL_SECONDS)
 
-    pending_result = await session.execute(
-        select(func.count(Article.id)).where(Article.rating_failed == True)
-    )
-    pending_count = pending_result.scalar_one()
+    return {
+        **article_stats,
+        "api_usage": {
+            "guardian": get_guardian_usage(),
+            "thenewsapi": get_thenewsapi_usage(),
+            "gemini": get_gemini_usage(),
+        },
+        "config": {
+            "rating_threshold": settings.RATING_THRESHOLD,
+            "guardian_enabled": settings.GUARDIAN_ENABLED,
+            "thenewsapi_enabled": settings.THENEWSAPI_ENABLED,
+        },
+    }
 
-    # Count pre-filtered (has excluded_reason starting with "keyword_")
-    filtered_result = await session.execute(
-        select(func.count(Article.id)).where(Article.excluded_reason.like("keyword_%"))
-    )
-    prefiltered_count = filtered_result.scalar_one()
 
-    # Count articles above threshold
-    above_threshold_result = await session.execute(
-        select(func.count(Article.id)).where(
+async def _article_stats(session: AsyncSession) -> dict:
+    """Compute article counts, score distribution and per-source counts."""
+    # All counters in a single aggregate query (one round-trip instead of ten)
+    score_buckets = [("0-25", 0, 25), ("25-50", 25, 50), ("50-75", 50, 75), ("75-100", 75, 101)]
+    counters = {
+        "rated": Article.is_rated == True,
+        "pending": Article.rating_failed == True,
+        # Pre-filtered articles have excluded_reason starting with "keyword_"
+        "prefiltered": Article.excluded_reason.like("keyword_%"),
+        "above_threshold": and_(
             Article.is_rated == True,
             Article.hopefulness_score >= settings.RATING_THRESHOLD,
+        ),
+        # Evaluated by the database, so no datetime is bound per query
+        "today": Article.fetched_at >= func.current_date(),
+    }
+    for label, low, high in score_buckets:
+        counters[label] = and_(
+            Article.is_rated == True,
+            Article.hopefulness_score >= low,
+            Article.hopefulness_score < high,
         )
-    )
-    above_threshold_count = above_threshold_result.scalar_one()
-
-    # Count by source
-    source_query = (
-        select(Article.source_name, func.count(Article.id).label("count"))
-        .group_by(Article.source_name)
-        .order_by(func.count(Article.id).desc())
-    )
-    source_result = await session.execute(source_query)
-    sources = {row.source_name: row.count for row in source_result.all()}
 
-    # Count fetched today
-    today_result = await session.execute(
-        select(func.count(Article.id)).where(Article.fetched_at >= today_start)
+    counts_query = select(
+        func.count(Article.id).label("total"),
+        *(func.sum(case((condition, 1), else_=0)).label(name) for name, condition in counters.items()),
     )
-    today_count = today_result.scalar_one()
+    counts_result = await session.execute(counts_query)
+    # SUM() over an empty table is NULL
+    counts = {name: value or 0 for name, value in counts_result.one()._mapping.items()}
 
     # Score distribution for rated articles
-    score_distribution = {}
-    for label, low, high in [("0-25", 0, 25), ("25-50", 25, 50), ("50-75", 50, 75), ("75-100", 75, 101)]:
-        bucket_result = await session.execute(
-            select(func.count(Article.id)).where(
-                Article.is_rated == True,
-                Article.hopefulness_score >= low,
-                Article.hopefulness_score < high,
-            )
-        )
-        score_distribution[label] = bucket_result.scalar_one()
+    score_distribution = {label: counts[label] for label, _, _ in score_buckets}
+
+    # Count by source
+    sources = dict(await _count_by(session, Article.source_name))
 
     return {
         "articles": {
-            "total": total_count,
-            "rated": rated_count,
-            "pending_rating": pending_count,
-            "prefiltered": prefiltered_count,
-            "above_threshold": above_threshold_count,
-            "fetched_today": today_count,
+            "total": counts["total"],
+            "rated": counts["rated"],
+            "pending_rating": counts["pending"],
+            "prefiltered": counts["prefiltered"],
+            "above_threshold": counts["above_threshold"],
+            "fetched_today": counts["today"],
         },
         "score_distribution": score_distribution,
         "sources": sources,
-        "api_usage": {
-            "guardian": get_guardian_usage(),
-            "thenewsapi": get_thenewsapi_usage(),
-            "gemini": get_gemini_usage(),
-        },
-        "config": {
-            "rating_threshold": settings.RATING_THRESHOLD,
-            "guardian_enabled": settings.GUARDIAN_ENABLED,
-            "thenewsapi_enabled": settings.THENEWSAPI_ENABLED,
-        },
     }
 
 
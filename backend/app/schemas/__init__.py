@@ -1,5 +1,6 @@
 from app.schemas.article import (
     ArticleCreate,
+    ArticleCursor,
     ArticleResponse,
     ArticleListResponse,
     CategoryCount,
@@ -8,6 +9,7 @@ from app.schemas.article import (
 
 __all__ = [
     "ArticleCreate",
+    "ArticleCursor",
     "ArticleResponse",
     "ArticleListResponse",
     "CategoryCount",
@@ -33,12 +33,19 @@ class ArticleResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ArticleCursor(BaseModel):
+    """Position of the last article on a page, for keyset pagination."""
+    published_at: datetime | None
+    id: int
+
+
 class ArticleListResponse(BaseModel):
     articles: list[ArticleResponse]
     total: int
     limit: int
     offset: int
     has_more: bool
+    next_cursor: ArticleCursor | None = None
 
 
 class CategoryCount(BaseModel):
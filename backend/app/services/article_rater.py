@@ -1,28 +1,37 @@
-import json
+import asyncio
 import logging
-from datetime import date
+import time
+from collections import deque
+from functools import lru_cache
 from typing import TypedDict
 
 import google.generativeai as genai
+import orjson
 
 from app.config import settings
+from app.services.rating_cache import rating_key, get_cached_ratings, cache_ratings
 from app.services.rating_prompt import RATING_SYSTEM_PROMPT, ARTICLE_PROMPT_TEMPLATE, BATCH_PROMPT_TEMPLATE
+from app.utils.dates import current_day
 
 logger = logging.getLogger(__name__)
 
 # Track daily Gemini API usage (resets each day)
 _usage_tracker = {
-    "date": None,
+    "day": None,  # UTC day number (days since the epoch)
     "requests": 0,
 }
 MAX_DAILY_REQUESTS = 20  # Gemini free tier RPD limit
 
+# Start times of Gemini requests in the last minute (monotonic clock)
+_recent_requests: deque[float] = deque()
+MAX_REQUESTS_PER_MINUTE = 5  # Gemini free tier RPM limit
+
 
 def _check_rate_limit() -> bool:
     """Check if we're within the daily rate limit."""
-    today = date.today()
-    if _usage_tracker["date"] != today:
-        _usage_tracker["date"] = today
+    today = current_day()
+    if _usage_tracker["day"] != today:
+        _usage_tracker["day"] = today
         _usage_tracker["requests"] = 0
     return _usage_tracker["requests"] < MAX_DAILY_REQUESTS
 
@@ -34,10 +43,22 @@ def _increment_usage():
     logger.info(f"Gemini API usage: {_usage_tracker['requests']}/{MAX_DAILY_REQUESTS} today ({remaining} remaining)")
 
 
+async def _wait_for_minute_slot() -> None:
+    """Wait until another request fits within the per-minute limit."""
+    while True:
+        now = time.monotonic()
+        while _recent_requests and now - _recent_requests[0] >= 60:
+            _recent_requests.popleft()
+        if len(_recent_requests) < MAX_REQUESTS_PER_MINUTE:
+            _recent_requests.append(now)
+            return
+        await asyncio.sleep(60 - (now - _recent_requests[0]))
+
+
 def get_gemini_usage() -> dict:
     """Get current Gemini API usage stats."""
-    today = date.today()
-    if _usage_tracker["date"] != today:
+    today = current_day()
+    if _usage_tracker["day"] != today:
         return {"requests": 0, "limit": MAX_DAILY_REQUESTS, "remaining": MAX_DAILY_REQUESTS}
 
     remaining = MAX_DAILY_REQUESTS - _usage_tracker["requests"]
@@ -48,6 +69,24 @@ def get_gemini_usage() -> dict:
     }
 
 
+def _format_articles(articles: list[dict]) -> str:
+    """Render articles as numbered blocks for the batch prompt."""
+    parts = []
+    append = parts.append
+    for i, a in enumerate(articles, 1):
+        if i > 1:
+            append("\n\n")
+        append("Article ")
+        append(str(i))
+        append(":\nTitle: ")
+        append(a.get("title", ""))
+        append("\nSummary: ")
+        append(a.get("summary") or "No summary available")
+        append("\nSource: ")
+        append(a.get("source", ""))
+    return "".join(parts)
+
+
 class RatingResult(TypedDict):
     score: int | None
     excluded_reason: str | None
@@ -55,13 +94,8 @@ class RatingResult(TypedDict):
 
 
 class ArticleRater:
-    _instance: "ArticleRater | None" = None
-    _model: genai.GenerativeModel | None = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    def __init__(self):
+        self._model: genai.GenerativeModel | None = None
 
     def _get_model(self) -> genai.GenerativeModel:
         """Lazy initialization of the model."""
@@ -72,19 +106,31 @@ class ArticleRater:
             self._model = genai.GenerativeModel("gemini-3-flash-preview")
         return self._model
 
+    def warmup(self) -> None:
+        """Configure the Gemini client at startup instead of on the first rating."""
+        try:
+            self._get_model()
+        except ValueError as e:
+            logger.warning(f"Article rating unavailable: {e}")
+
     def can_rate(self) -> bool:
         """Check if we can make another rating request today."""
         return _check_rate_limit()
 
     def get_remaining_requests(self) -> int:
         """Get number of remaining requests for today."""
-        today = date.today()
-        if _usage_tracker["date"] != today:
+        today = current_day()
+        if _usage_tracker["day"] != today:
             return MAX_DAILY_REQUESTS
         return MAX_DAILY_REQUESTS - _usage_tracker["requests"]
 
     async def rate_article(self, title: str, summary: str, source: str) -> RatingResult:
         """Rate a single article."""
+        key = rating_key(title, summary or "", source)
+        cached = await get_cached_ratings([key])
+        if key in cached:
+            return RatingResult(**cached[key])
+
         # Check rate limit before making request
         if not _check_rate_limit():
             logger.warning("Gemini API daily limit reached, skipping rating")
@@ -98,6 +144,7 @@ class ArticleRater:
 
         try:
             model = self._get_model()
+            await _wait_for_minute_slot()
             response = await model.generate_content_async(
                 [RATING_SYSTEM_PROMPT, prompt],
                 generation_config=genai.GenerationConfig(
@@ -105,12 +152,15 @@ class ArticleRater:
                 ),
             )
             _increment_usage()
-            result = json.loads(response.text)
-            return RatingResult(
+            result = orjson.loads(response.text)
+            rating = RatingResult(
                 score=int(result["score"]) if result.get("score") is not None else None,
                 excluded_reason=result.get("excluded_reason"),
                 rationale=result.get("rationale", ""),
             )
+            if rating["score"] is not None:
+                await cache_ratings({key: rating})
+            return rating
         except Exception as e:
             logger.error(f"Rating failed for '{title}': {e}")
             return RatingResult(score=None, excluded_reason=None, rationale=f"Error: {e}")
@@ -127,20 +177,36 @@ class ArticleRater:
         if not articles:
             return []
 
+        # Reuse ratings for articles already scored under the current prompts
+        keys = [rating_key(a.get("title", ""), a.get("summary") or "", a.get("source", "")) for a in articles]
+        cached = await get_cached_ratings(keys)
+        # One request slot per distinct uncached key: syndicated copies of the
+        # same story share a key and get the same rating
+        misses: dict[str, dict] = {}
+        for article, key in zip(articles, keys):
+            if key not in cached:
+                misses.setdefault(key, article)
+        if len(misses) < len(articles):
+            logger.info(f"Rating cache: {len(articles) - len(misses)} hits, {len(misses)} to rate")
+
+        fresh = dict(zip(misses, await self._request_batch(list(misses.values())))) if misses else {}
+        ratings = [RatingResult(**cached[key]) if key in cached else fresh[key] for key in keys]
+
+        await cache_ratings({key: rating for key, rating in fresh.items() if rating["score"] is not None})
+        return ratings
+
+    async def _request_batch(self, articles: list[dict]) -> list[RatingResult]:
+        """Send one batch prompt to Gemini and map the replies back to articles."""
         # Check rate limit before making request
         if not _check_rate_limit():
             logger.warning("Gemini API daily limit reached, skipping batch rating")
             return [RatingResult(score=None, excluded_reason=None, rationale="Daily limit reached") for _ in articles]
 
-        # Format articles for the prompt
-        articles_text = "\n\n".join(
-            f"Article {i+1}:\nTitle: {a.get('title', '')}\nSummary: {a.get('summary') or 'No summary available'}\nSource: {a.get('source', '')}"
-            for i, a in enumerate(articles)
-        )
-        prompt = BATCH_PROMPT_TEMPLATE.format(articles=articles_text)
+        prompt = BATCH_PROMPT_TEMPLATE.format(articles=_format_articles(articles))
 
         try:
             model = self._get_model()
+            await _wait_for_minute_slot()
             response = await model.generate_content_async(
                 [RATING_SYSTEM_PROMPT, prompt],
                 generation_config=genai.GenerationConfig(
@@ -148,7 +214,7 @@ class ArticleRater:
                 ),
             )
             _increment_usage()
-            results = json.loads(response.text)
+            results = orjson.loads(response.text)
 
             # Ensure we got an array
             if not isinstance(results, list):
@@ -178,6 +244,7 @@ class ArticleRater:
             return [RatingResult(score=None, excluded_reason=None, rationale=f"Batch error: {e}") for _ in articles]
 
 
-# Lazy singleton
+@lru_cache(maxsize=1)
 def get_rater() -> ArticleRater:
+    """Get the shared rater, created on first use."""
     return ArticleRater()
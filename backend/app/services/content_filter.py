@@ -1,3 +1,5 @@
+import ahocorasick
+
 POSITIVE_KEYWORDS = {
     "high": [
         "breakthrough",
@@ -126,20 +128,40 @@ def calculate_hopefulness_score(headline: str, summary: str) -> float:
     return max(0.0, min(1.0, score))
 
 
+def _build_category_automaton() -> ahocorasick.Automaton:
+    """Compile the category keywords into one Aho-Corasick automaton.
+
+    Values are (keyword, categories) so each keyword is counted once however
+    often it appears, matching the old per-keyword substring checks.
+    """
+    keyword_categories: dict[str, list[str]] = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword.lower(), []).append(category)
+
+    automaton = ahocorasick.Automaton()
+    for keyword, categories in keyword_categories.items():
+        automaton.add_word(keyword, (keyword, categories))
+    automaton.make_automaton()
+    return automaton
+
+
+CATEGORY_AUTOMATON = _build_category_automaton()
+
+
 def detect_category(headline: str, summary: str) -> str:
     """Detect the category based on keyword matches."""
     text = f"{headline} {summary}".lower()
-    category_counts: dict[str, int] = {}
-
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        count = sum(1 for keyword in keywords if keyword in text)
-        if count > 0:
-            category_counts[category] = count
 
-    if not category_counts:
-        return "general"
+    # Single pass over the text; ties go to the category declared first
+    matched = {keyword: categories for _, (keyword, categories) in CATEGORY_AUTOMATON.iter(text)}
+    category_counts = dict.fromkeys(CATEGORY_KEYWORDS, 0)
+    for categories in matched.values():
+        for category in categories:
+            category_counts[category] += 1
 
-    return max(category_counts, key=lambda k: category_counts[k])
+    best = max(category_counts, key=category_counts.__getitem__)
+    return best if category_counts[best] else "general"
 
 
 def should_include(headline: str, summary: str) -> bool:
@@ -1,9 +1,10 @@
 import logging
-from datetime import datetime, date
+from datetime import datetime, timezone
 
 import httpx
 
 from app.config import settings
+from app.utils.dates import current_day
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ GUARDIAN_SECTIONS = [
 
 # Track daily usage (resets each day)
 _usage_tracker = {
-    "date": None,
+    "day": None,  # UTC day number (days since the epoch)
     "requests": 0,
 }
 MAX_DAILY_REQUESTS = 500
@@ -28,9 +29,9 @@ WARNING_THRESHOLD = 400  # Warn when approaching limit
 
 def _check_rate_limit() -> bool:
     """Check if we're within the daily rate limit."""
-    today = date.today()
-    if _usage_tracker["date"] != today:
-        _usage_tracker["date"] = today
+    today = current_day()
+    if _usage_tracker["day"] != today:
+        _usage_tracker["day"] = today
         _usage_tracker["requests"] = 0
 
     return _usage_tracker["requests"] < MAX_DAILY_REQUESTS
@@ -49,8 +50,8 @@ def _increment_usage():
 
 def get_guardian_usage() -> dict:
     """Get current Guardian API usage stats."""
-    today = date.today()
-    if _usage_tracker["date"] != today:
+    today = current_day()
+    if _usage_tracker["day"] != today:
         return {"requests": 0, "limit": MAX_DAILY_REQUESTS, "remaining": MAX_DAILY_REQUESTS}
 
     remaining = MAX_DAILY_REQUESTS - _usage_tracker["requests"]
@@ -66,9 +67,13 @@ def parse_guardian_date(date_str: str | None) -> datetime | None:
     if not date_str:
         return None
     try:
-        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+        published = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
     except (ValueError, TypeError):
         return None
+    # Stored as naive UTC, the same as RSS dates
+    if published.tzinfo is not None:
+        published = published.astimezone(timezone.utc).replace(tzinfo=None)
+    return published
 
 
 async def fetch_guardian_section(client: httpx.AsyncClient, section: str) -> list[dict]:
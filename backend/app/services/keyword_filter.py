@@ -1,6 +1,7 @@
-import re
 from typing import TypedDict
 
+import ahocorasick
+
 NEGATIVE_KEYWORDS = {
     "violence": [
         "killed", "murder", "shooting", "stabbing", "assault", "robbery",
@@ -38,43 +39,49 @@ TRIVIAL_KEYWORDS = {
 }
 
 
+def _build_automaton() -> ahocorasick.Automaton:
+    """Compile every keyword into one Aho-Corasick automaton.
+
+    Values are (priority, reason prefix, keyword); a lower priority wins, so
+    negative categories beat trivial ones in the order they are declared.
+    """
+    automaton = ahocorasick.Automaton()
+    categories = [
+        (f"keyword_{category}", keywords) for category, keywords in NEGATIVE_KEYWORDS.items()
+    ] + [("keyword_trivial", keywords) for keywords in TRIVIAL_KEYWORDS.values()]
+    for priority, (reason, keywords) in enumerate(categories):
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if keyword not in automaton:
+                automaton.add_word(keyword, (priority, reason, keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = _build_automaton()
+
+
 class FilterResult(TypedDict):
     passed: bool
     reason: str | None
 
 
-def check_keywords(text: str, keywords: list[str]) -> str | None:
-    """Check if text contains any keywords. Returns matched keyword or None."""
-    text_lower = text.lower()
-    for keyword in keywords:
-        if keyword.lower() in text_lower:
-            return keyword
-    return None
-
-
 def pre_filter_article(title: str, summary: str) -> FilterResult:
     """
     Pre-filter article based on keywords before sending to Gemini.
     Returns { "passed": bool, "reason": str or None }
     """
-    text = f"{title} {summary}"
+    text = f"{title} {summary}".lower()
 
-    # Check negative keywords
-    for category, keywords in NEGATIVE_KEYWORDS.items():
-        matched = check_keywords(text, keywords)
-        if matched:
-            return FilterResult(
-                passed=False,
-                reason=f"keyword_{category}:{matched}"
-            )
+    # Single pass over the text, reporting every (overlapping) keyword hit
+    best = None
+    for _, (priority, reason, keyword) in KEYWORD_AUTOMATON.iter(text):
+        if best is None or priority < best[0]:
+            best = (priority, f"{reason}:{keyword}")
+            if priority == 0:
+                break
 
-    # Check trivial keywords
-    for category, keywords in TRIVIAL_KEYWORDS.items():
-        matched = check_keywords(text, keywords)
-        if matched:
-            return FilterResult(
-                passed=False,
-                reason=f"keyword_trivial:{matched}"
-            )
+    if best is not None:
+        return FilterResult(passed=False, reason=best[1])
 
     return FilterResult(passed=True, reason=None)
@@ -6,9 +6,10 @@ import httpx
 from datetime import datetime
 from time import struct_time
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import DIALECT_INSERTS
 from app.models import Article
 from app.services.content_filter import detect_category
 from app.services.article_rater import get_rater
@@ -16,9 +17,30 @@ from app.services.guardian_fetcher import fetch_guardian_articles
 from app.services.thenewsapi_fetcher import fetch_thenewsapi_articles
 from app.services.keyword_filter import pre_filter_article
 from app.services.article_selector import select_balanced_articles
+from app.utils.cache import invalidate_cache
 
-# Batch size for rating (multiple articles per API call)
-ARTICLES_PER_BATCH = 10
+# Batch size for rating (multiple articles per API call). Every call counts
+# against Gemini's daily request cap, so bigger batches rate more per day.
+ARTICLES_PER_BATCH = 15
+
+# GUIDs per existence-check query (SQLite allows 999 bind parameters on older builds)
+GUID_LOOKUP_CHUNK = 500
+
+# Newest entries taken from each RSS feed per fetch
+MAX_ENTRIES_PER_FEED = 40
+
+# Article pages fetched at once when looking up missing images
+OG_FETCH_CONCURRENCY = 16
+
+# Most pages close <head> well within this many bytes
+OG_SCAN_BYTES = 16 * 1024
+
+# og:image lookup runs on lowercased page bytes. Meta tags are tokenized
+# first; stopping each tag at the next "<" keeps the scan linear even on
+# malformed markup, and the attribute patterns only ever see a single tag.
+META_TAG_RE = re.compile(rb"<meta\b[^<>]*>")
+OG_IMAGE_PROPERTY_RE = re.compile(rb'property=["\']og:image["\']')
+META_CONTENT_RE = re.compile(rb'content=["\']([^"\']+)["\']')
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +51,10 @@ RSS_SOURCES = [
     {"name": "Reasons to be Cheerful", "url": "https://reasonstobecheerful.world/feed/"},
 ]
 
+# Validators and parsed articles from each feed's last full response, so an
+# unchanged feed costs a 304 instead of a download and re-parse
+_feed_cache: dict[str, tuple[str | None, str | None, list[dict]]] = {}
+
 
 def parse_published_date(date_parsed: struct_time | None) -> datetime | None:
     """Convert feedparser's time tuple to datetime."""
@@ -43,68 +69,114 @@ def parse_published_date(date_parsed: struct_time | None) -> datetime | None:
 def extract_image_url(entry: dict) -> str | None:
     """Extract image URL from RSS entry using various methods."""
     # Try media:content
-    if hasattr(entry, "media_content") and entry.media_content:
-        for media in entry.media_content:
+    media_content = entry.get("media_content")
+    if media_content:
+        for media in media_content:
             if media.get("medium") == "image" or media.get("type", "").startswith("image/"):
                 return media.get("url")
         # If no explicit image type, take first media_content with url
-        if entry.media_content[0].get("url"):
-            return entry.media_content[0].get("url")
+        if media_content[0].get("url"):
+            return media_content[0].get("url")
 
     # Try media:thumbnail
-    if hasattr(entry, "media_thumbnail") and entry.media_thumbnail:
-        return entry.media_thumbnail[0].get("url")
+    media_thumbnail = entry.get("media_thumbnail")
+    if media_thumbnail:
+        return media_thumbnail[0].get("url")
 
     # Try enclosures
-    if hasattr(entry, "enclosures") and entry.enclosures:
-        for enclosure in entry.enclosures:
-            if enclosure.get("type", "").startswith("image/"):
-                return enclosure.get("href") or enclosure.get("url")
+    for enclosure in entry.get("enclosures", ()):
+        if enclosure.get("type", "").startswith("image/"):
+            return enclosure.get("href") or enclosure.get("url")
 
     # Try links with image type
-    if hasattr(entry, "links"):
-        for link in entry.links:
-            if link.get("type", "").startswith("image/"):
-                return link.get("href")
+    for link in entry.get("links", ()):
+        if link.get("type", "").startswith("image/"):
+            return link.get("href")
 
     return None
 
 
-async def fetch_og_image(url: str) -> str | None:
+async def fetch_og_image(client: httpx.AsyncClient, url: str) -> str | None:
     """Fetch og:image meta tag from article URL."""
     try:
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            response = await client.get(url, headers={
-                "User-Agent": "Mozilla/5.0 (compatible; BrightWorldNews/1.0)"
-            })
+        # og:image lives in <head>, so stop downloading once it's closed.
+        # Tag syntax is ASCII, so match against a lowercased copy (bytes.lower
+        # keeps offsets) and slice the URL out of the original bytes.
+        head = bytearray()
+        head_lower = bytearray()
+        async with client.stream("GET", url) as response:
             if response.status_code != 200:
                 return None
+            async for chunk in response.aiter_bytes():
+                head += chunk
+                head_lower += chunk.lower()
+                if len(head) >= OG_SCAN_BYTES or b"</head>" in head_lower:
+                    break
+
+        for tag in META_TAG_RE.finditer(head_lower):
+            if OG_IMAGE_PROPERTY_RE.search(head_lower, tag.start(), tag.end()):
+                content = META_CONTENT_RE.search(head_lower, tag.start(), tag.end())
+                if content:
+                    start, end = content.span(1)
+                    return head[start:end].decode("utf-8", errors="replace")
 
-            html = response.text[:50000]  # Only check first 50KB
+        return None
+    except Exception:
+        return None
 
-            # Look for og:image meta tag
-            patterns = [
-                r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']',
-                r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+property=["\']og:image["\']',
-            ]
 
-            for pattern in patterns:
-                match = re.search(pattern, html, re.IGNORECASE)
-                if match:
-                    return match.group(1)
+async def fetch_missing_images(articles: list[dict]) -> None:
+    """Fill in image_url from each article page's og:image, fetching concurrently."""
+    missing = [a for a in articles if not a.get("image_url") and a.get("link")]
+    if not missing:
+        return
 
-            return None
-    except Exception:
-        return None
+    # Queue on the semaphore rather than the connection pool: time spent
+    # waiting for a pooled connection counts against the request timeout
+    semaphore = asyncio.Semaphore(OG_FETCH_CONCURRENCY)
+
+    async def fetch_bounded(client: httpx.AsyncClient, url: str) -> str | None:
+        async with semaphore:
+            return await fetch_og_image(client, url)
+
+    async with httpx.AsyncClient(
+        timeout=10.0,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=OG_FETCH_CONCURRENCY),
+        headers={"User-Agent": "Mozilla/5.0 (compatible; BrightWorldNews/1.0)"},
+    ) as client:
+        image_urls = await asyncio.gather(*(fetch_bounded(client, a["link"]) for a in missing))
 
+    for article, image_url in zip(missing, image_urls):
+        article["image_url"] = image_url
 
-def fetch_rss_feed(url: str) -> list[dict]:
-    """Fetch and parse an RSS feed, returning a list of article dicts."""
+
+async def fetch_rss_feed(client: httpx.AsyncClient, url: str) -> list[dict]:
+    """Download and parse an RSS feed, returning a list of article dicts."""
     try:
-        feed = feedparser.parse(url)
+        headers = {}
+        cached = _feed_cache.get(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            # Copies, since callers annotate the article dicts in place
+            return [dict(article) for article in cached[2]]
+        response.raise_for_status()
+
+        # Parsing is CPU-bound, so keep it off the event loop
+        feed = await asyncio.to_thread(
+            feedparser.parse, response.content, response_headers=dict(response.headers)
+        )
         articles = []
 
-        for entry in feed.entries:
+        # Feeds list newest first; older entries are already stored or too old to matter
+        for entry in feed.entries[:MAX_ENTRIES_PER_FEED]:
             article = {
                 "title": entry.get("title", ""),
                 "link": entry.get("link", ""),
@@ -115,17 +187,29 @@ def fetch_rss_feed(url: str) -> list[dict]:
             }
             articles.append(article)
 
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            _feed_cache[url] = (etag, last_modified, [dict(article) for article in articles])
+
         return articles
     except Exception:
         return []
 
 
-def fetch_rss_sources() -> list[dict]:
-    """Fetch articles from RSS sources only."""
-    all_articles = []
+async def fetch_rss_sources() -> list[dict]:
+    """Fetch articles from RSS sources only, downloading all feeds concurrently."""
+    async with httpx.AsyncClient(
+        timeout=15.0,
+        follow_redirects=True,
+        headers={"User-Agent": "Mozilla/5.0 (compatible; BrightWorldNews/1.0)"},
+    ) as client:
+        results = await asyncio.gather(
+            *(fetch_rss_feed(client, source["url"]) for source in RSS_SOURCES)
+        )
 
-    for source in RSS_SOURCES:
-        articles = fetch_rss_feed(source["url"])
+    all_articles = []
+    for source, articles in zip(RSS_SOURCES, results):
         for article in articles:
             article["source_name"] = source["name"]
         all_articles.extend(articles)
@@ -138,18 +222,20 @@ async def fetch_all_sources() -> list[dict]:
     all_articles = []
     source_counts = {}
 
-    # Fetch from RSS feeds (synchronous)
-    rss_articles = fetch_rss_sources()
+    # RSS feeds, Guardian API and TheNewsAPI are independent, so fetch them
+    # concurrently; each returns an empty list on failure
+    rss_articles, guardian_articles, thenewsapi_articles = await asyncio.gather(
+        fetch_rss_sources(),
+        fetch_guardian_articles(),
+        fetch_thenewsapi_articles(),
+    )
+
     all_articles.extend(rss_articles)
     source_counts["RSS Feeds"] = len(rss_articles)
 
-    # Fetch from Guardian API
-    guardian_articles = await fetch_guardian_articles()
     all_articles.extend(guardian_articles)
     source_counts["The Guardian"] = len(guardian_articles)
 
-    # Fetch from TheNewsAPI
-    thenewsapi_articles = await fetch_thenewsapi_articles()
     all_articles.extend(thenewsapi_articles)
     source_counts["TheNewsAPI"] = len(thenewsapi_articles)
 
@@ -170,22 +256,56 @@ async def fetch_all_sources() -> list[dict]:
     return unique_articles
 
 
+def _article_row(
+    article_data: dict,
+    *,
+    hopefulness_score: int | None,
+    is_rated: bool,
+    rating_failed: bool,
+    excluded_reason: str | None,
+) -> dict:
+    """Build the articles table row for a fetched article."""
+    headline = article_data.get("title", "")
+    summary = article_data.get("summary") or ""
+    return dict(
+        guid=article_data.get("guid"),
+        headline=headline,
+        summary=summary,
+        source_url=article_data.get("link", ""),
+        source_name=article_data.get("source_name", ""),
+        image_url=article_data.get("image_url"),
+        published_at=article_data.get("published"),
+        hopefulness_score=hopefulness_score,
+        category=detect_category(headline, summary),
+        is_rated=is_rated,
+        rating_failed=rating_failed,
+        excluded_reason=excluded_reason,
+    )
+
+
 async def store_articles(articles: list[dict], session: AsyncSession) -> int:
     """Store articles in the database, rating them with Gemini first."""
     if not articles:
         return 0
 
-    # Get all GUIDs from fetched articles
-    guids = [a.get("guid") for a in articles if a.get("guid")]
-    if not guids:
+    # Index fetched articles by GUID, keeping the first copy of any duplicate
+    by_guid = {}
+    for article in articles:
+        if article.get("guid"):
+            by_guid.setdefault(article["guid"], article)
+    if not by_guid:
         return 0
 
-    # Batch query for existing articles
-    result = await session.execute(select(Article.guid).where(Article.guid.in_(guids)))
-    existing_guids = set(row[0] for row in result.all())
+    # Batch query for existing articles (served by the unique guid index),
+    # chunked to stay under the database's bind parameter limit
+    guids = list(by_guid)
+    existing_guids = set()
+    for start in range(0, len(guids), GUID_LOOKUP_CHUNK):
+        chunk = guids[start:start + GUID_LOOKUP_CHUNK]
+        existing_guids.update(await session.scalars(select(Article.guid).where(Article.guid.in_(chunk))))
 
     # Filter to only new articles
-    new_articles = [a for a in articles if a.get("guid") and a["guid"] not in existing_guids]
+    new_articles = [a for guid, a in by_guid.items() if guid not in existing_guids]
     if not new_articles:
         logger.info("No new articles to process")
         return 0
@@ -210,9 +330,13 @@ async def store_articles(articles: list[dict], session: AsyncSession) -> int:
     if filtered_out:
         logger.info(f"Pre-filter: {len(filtered_out)} articles filtered out, {len(passed_filter)} passed")
 
+    # Look up missing images for all new articles at once
+    await fetch_missing_images(new_articles)
+
     # Use balanced selection (round-robin by source) for fair distribution
     rater = get_rater()
     new_count = 0
+    rows = []
 
     # Calculate how many articles we can rate based on remaining API quota
     # Each API call rates ARTICLES_PER_BATCH articles
@@ -233,130 +357,85 @@ async def store_articles(articles: list[dict], session: AsyncSession) -> int:
 
     # Store filtered-out articles first (no Gemini call needed)
     for article_data in filtered_out:
-        headline = article_data.get("title", "")
-        summary = article_data.get("summary") or ""
-        category = detect_category(headline, summary)
-
-        image_url = article_data.get("image_url")
-        if not image_url:
-            article_link = article_data.get("link", "")
-            if article_link:
-                image_url = await fetch_og_image(article_link)
-
-        article = Article(
-            guid=article_data.get("guid"),
-            headline=headline,
-            summary=summary,
-            source_url=article_data.get("link", ""),
-            source_name=article_data.get("source_name", ""),
-            image_url=image_url,
-            published_at=article_data.get("published"),
+        rows.append(_article_row(
+            article_data,
             hopefulness_score=None,
-            category=category,
             is_rated=True,  # Mark as rated so it doesn't go to retry queue
             rating_failed=False,
             excluded_reason=article_data.get("_filter_reason"),
-        )
-        session.add(article)
+        ))
         new_count += 1
 
     # Rate articles in batches (multiple articles per API call)
-    rated_count = 0
-    for batch_start in range(0, len(articles_to_rate), ARTICLES_PER_BATCH):
-        # Check if we still have API quota
-        if not rater.can_rate():
-            logger.info(f"Gemini daily limit reached after rating {rated_count} articles")
-            # Move remaining to unrated list
-            articles_to_store_unrated.extend(articles_to_rate[batch_start:])
-            break
-
-        batch = articles_to_rate[batch_start:batch_start + ARTICLES_PER_BATCH]
-        batch_input = [
+    batches = [
+        articles_to_rate[i:i + ARTICLES_PER_BATCH]
+        for i in range(0, len(articles_to_rate), ARTICLES_PER_BATCH)
+    ]
+
+    # Check we still have API quota for every batch; the rest waits for retry
+    affordable = rater.get_remaining_requests()
+    if len(batches) > affordable:
+        logger.info(f"Gemini daily limit allows only {affordable} of {len(batches)} batches")
+        for batch in batches[affordable:]:
+            articles_to_store_unrated.extend(batch)
+        batches = batches[:affordable]
+
+    # Send batches concurrently; the rater spaces them to the per-minute limit
+    if batches:
+        logger.info(f"Batch rating {sum(len(b) for b in batches)} articles in {len(batches)} API calls")
+    batch_ratings = await asyncio.gather(*(
+        rater.rate_articles_batch([
             {"title": a.get("title", ""), "summary": a.get("summary") or "", "source": a.get("source_name", "")}
             for a in batch
-        ]
-
-        logger.info(f"Batch rating {len(batch)} articles in single API call")
-        ratings = await rater.rate_articles_batch(batch_input)
+        ])
+        for batch in batches
+    ))
 
+    rated_count = 0
+    for batch, ratings in zip(batches, batch_ratings):
         for article_data, rating in zip(batch, ratings):
-            headline = article_data.get("title", "")
-            summary = article_data.get("summary") or ""
-            guid = article_data.get("guid")
-
-            # Detect category
-            category = detect_category(headline, summary)
-
-            # Get image URL
-            image_url = article_data.get("image_url")
-            if not image_url:
-                article_link = article_data.get("link", "")
-                if article_link:
-                    image_url = await fetch_og_image(article_link)
-
-            # Determine rating status
             score = rating.get("score")
-            rating_failed = score is None
-            is_rated = not rating_failed
-
-            article = Article(
-                guid=guid,
-                headline=headline,
-                summary=summary,
-                source_url=article_data.get("link", ""),
-                source_name=article_data.get("source_name", ""),
-                image_url=image_url,
-                published_at=article_data.get("published"),
+            rows.append(_article_row(
+                article_data,
                 hopefulness_score=score,
-                category=category,
-                is_rated=is_rated,
-                rating_failed=rating_failed,
+                is_rated=score is not None,
+                rating_failed=score is None,
                 excluded_reason=rating.get("excluded_reason"),
-            )
-            session.add(article)
+            ))
             new_count += 1
             rated_count += 1
 
             if score is not None:
-                logger.debug(f"Rated '{headline[:50]}': {score}")
-
-        # Delay between batches to respect RPM limit (5 req/min)
-        if batch_start + ARTICLES_PER_BATCH < len(articles_to_rate):
-            await asyncio.sleep(15)
+                logger.debug(f"Rated '{article_data.get('title', '')[:50]}': {score}")
 
     if rated_count > 0:
         logger.info(f"Rated {rated_count} articles this fetch cycle")
 
     # Store remaining articles without rating (will be rated later by retry job)
     for article_data in articles_to_store_unrated:
-        headline = article_data.get("title", "")
-        summary = article_data.get("summary") or ""
-        category = detect_category(headline, summary)
-
-        image_url = article_data.get("image_url")
-        if not image_url:
-            article_link = article_data.get("link", "")
-            if article_link:
-                image_url = await fetch_og_image(article_link)
-
-        article = Article(
-            guid=article_data.get("guid"),
-            headline=headline,
-            summary=summary,
-            source_url=article_data.get("link", ""),
-            source_name=article_data.get("source_name", ""),
-            image_url=image_url,
-            published_at=article_data.get("published"),
+        rows.append(_article_row(
+            article_data,
             hopefulness_score=None,
-            category=category,
             is_rated=False,
             rating_failed=True,  # Mark as failed so retry job picks them up
             excluded_reason=None,
-        )
-        session.add(article)
+        ))
         new_count += 1
 
+    # Single executemany INSERT instead of one flush per ORM object. Another
+    # worker's fetch may have stored some of these since the guid check, so
+    # skip conflicting rows and count only what was actually inserted.
+    dialect_insert = DIALECT_INSERTS.get(session.bind.dialect.name)
+    if dialect_insert is not None:
+        result = await session.execute(
+            dialect_insert(Article).on_conflict_do_nothing(index_elements=["guid"]).returning(Article.guid),
+            rows,
+        )
+        new_count = len(result.all())
+    else:
+        await session.execute(insert(Article), rows)
     await session.commit()
+    invalidate_cache()
     rated_count = len(articles_to_rate)
     unrated_count = len(articles_to_store_unrated)
     logger.info(f"Stored {new_count} articles ({rated_count} rated, {unrated_count} pending)")
@@ -0,0 +1,70 @@
+import hashlib
+import logging
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import DIALECT_INSERTS, async_session
+from app.models import RatingCache
+from app.services.rating_prompt import RATING_SYSTEM_PROMPT, ARTICLE_PROMPT_TEMPLATE, BATCH_PROMPT_TEMPLATE
+
+logger = logging.getLogger(__name__)
+
+# Editing any prompt changes this, so ratings from an older prompt are never reused
+PROMPT_VERSION = hashlib.sha256(
+    "\n".join([RATING_SYSTEM_PROMPT, ARTICLE_PROMPT_TEMPLATE, BATCH_PROMPT_TEMPLATE]).encode()
+).hexdigest()[:16]
+
+
+def rating_key(title: str, summary: str, source: str) -> str:
+    """Cache key for an article's rating under the current prompts."""
+    return hashlib.sha256(f"{PROMPT_VERSION}\n{title}\n{summary}\n{source}".encode()).hexdigest()
+
+
+async def get_cached_ratings(keys: list[str]) -> dict[str, dict]:
+    """Look up stored ratings by key. Missing keys are simply absent."""
+    try:
+        async with async_session() as session:
+            result = await session.execute(
+                select(
+                    RatingCache.key,
+                    RatingCache.score,
+                    RatingCache.excluded_reason,
+                    RatingCache.rationale,
+                ).where(RatingCache.key.in_(set(keys)))
+            )
+            return {
+                key: {"score": score, "excluded_reason": excluded_reason, "rationale": rationale}
+                for key, score, excluded_reason, rationale in result.all()
+            }
+    except SQLAlchemyError as e:
+        logger.warning(f"Rating cache lookup failed: {e}")
+        return {}
+
+
+async def cache_ratings(ratings: dict[str, dict]) -> None:
+    """Store successful ratings by key."""
+    if not ratings:
+        return
+    rows = [
+        {
+            "key": key,
+            "score": r["score"],
+            "excluded_reason": r.get("excluded_reason"),
+            "rationale": r.get("rationale", ""),
+        }
+        for key, r in ratings.items()
+    ]
+    try:
+        async with async_session() as session:
+            # Another worker may cache the same key at any point, so let the
+            # database skip conflicting rows instead of checking beforehand
+            dialect_insert = DIALECT_INSERTS.get(session.bind.dialect.name)
+            if dialect_insert is not None:
+                statement = dialect_insert(RatingCache).on_conflict_do_nothing(index_elements=["key"])
+            else:
+                statement = insert(RatingCache)
+            await session.execute(statement, rows)
+            await session.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Rating cache write failed: {e}")
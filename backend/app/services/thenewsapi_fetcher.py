@@ -1,10 +1,11 @@
 import logging
 import hashlib
-from datetime import datetime, date
+from datetime import datetime, timezone
 
 import httpx
 
 from app.config import settings
+from app.utils.dates import current_day
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +13,7 @@ THENEWSAPI_BASE_URL = "https://api.thenewsapi.com/v1/news/top"
 
 # Track daily usage (resets each day)
 _usage_tracker = {
-    "date": None,
+    "day": None,  # UTC day number (days since the epoch)
     "requests": 0,
 }
 MAX_DAILY_REQUESTS = 3
@@ -20,9 +21,9 @@ MAX_DAILY_REQUESTS = 3
 
 def _check_rate_limit() -> bool:
     """Check if we're within the daily rate limit."""
-    today = date.today()
-    if _usage_tracker["date"] != today:
-        _usage_tracker["date"] = today
+    today = current_day()
+    if _usage_tracker["day"] != today:
+        _usage_tracker["day"] = today
         _usage_tracker["requests"] = 0
 
     return _usage_tracker["requests"] < MAX_DAILY_REQUESTS
@@ -37,8 +38,8 @@ def _increment_usage():
 
 def get_thenewsapi_usage() -> dict:
     """Get current TheNewsAPI usage stats."""
-    today = date.today()
-    if _usage_tracker["date"] != today:
+    today = current_day()
+    if _usage_tracker["day"] != today:
         return {"requests": 0, "limit": MAX_DAILY_REQUESTS, "remaining": MAX_DAILY_REQUESTS}
 
     remaining = MAX_DAILY_REQUESTS - _usage_tracker["requests"]
@@ -54,9 +55,13 @@ def parse_thenewsapi_date(date_str: str | None) -> datetime | None:
     if not date_str:
         return None
     try:
-        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+        published = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
     except (ValueError, TypeError):
         return None
+    # Stored as naive UTC, the same as RSS dates
+    if published.tzinfo is not None:
+        published = published.astimezone(timezone.utc).replace(tzinfo=None)
+    return published
 
 
 def generate_guid(url: str) -> str:
@@ -0,0 +1,31 @@
+import time
+from collections.abc import Hashable
+from typing import Any
+
+# Per-process cache for endpoint results that only change when articles are
+# written: key -> (expires_at, value). Each gunicorn worker has its own copy,
+# so entries must expire quickly enough to pick up other workers' writes
+_cache: dict[Hashable, tuple[float, Any]] = {}
+
+
+def get_cached(key: Hashable) -> Any | None:
+    """Return the cached value for key, or None if missing or expired."""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+
+    expires_at, value = entry
+    if time.monotonic() >= expires_at:
+        _cache.pop(key, None)
+        return None
+    return value
+
+
+def set_cached(key: Hashable, value: Any, ttl_seconds: float) -> None:
+    """Cache a value for ttl_seconds."""
+    _cache[key] = (time.monotonic() + ttl_seconds, value)
+
+
+def invalidate_cache() -> None:
+    """Drop this process's cached results. Call after writing articles."""
+    _cache.clear()
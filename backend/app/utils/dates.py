@@ -0,0 +1,6 @@
+import time
+
+
+def current_day() -> int:
+    """Current UTC day as days since the epoch, the bucket for daily quotas and caches."""
+    return int(time.time() // 86400)
@@ -1,46 +1,146 @@
 import asyncio
+import functools
 import logging
-from datetime import datetime, timedelta
+import random
+import time
+from datetime import datetime, timedelta, timezone
 
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import OperationalError
 
 from app.config import settings
 from app.database import async_session
-from app.models import Article
-from app.services.news_fetcher import fetch_and_store, ARTICLES_PER_BATCH
+from app.models import Article, RatingCache
+from app.services.news_fetcher import fetch_all_sources, store_articles, ARTICLES_PER_BATCH
 from app.services.article_rater import get_rater
 from app.services.keyword_filter import pre_filter_article
 from app.services.article_selector import select_balanced_articles
+from app.utils.cache import invalidate_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so every process runs the scheduler
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
+# Max Gemini batch calls' worth of pending articles loaded per retry run
+RETRY_BATCHES_PER_RUN = 4
+
+# Delay before the first hourly retry run. Fetches fire on whole hours after
+# startup, so this keeps the two Gemini-calling jobs from starting together
+RETRY_START_OFFSET = timedelta(minutes=30)
+
+# Rows removed per DELETE (and per commit) by the cleanup job
+CLEANUP_CHUNK_SIZE = 5000
+
+# Articles and cached ratings older than this are deleted by the cleanup job
+RETENTION = timedelta(days=settings.RETENTION_DAYS)
+
+# Attempts per job run when the database errors out transiently (locked
+# SQLite file, dropped server connection), and the first backoff delay
+JOB_RETRY_ATTEMPTS = 3
+JOB_RETRY_BASE_DELAY = 2.0  # seconds, doubled after each failed attempt
+
+# Open handle whose flock marks this process as the one running scheduled
+# jobs; kept open for the life of the process so the lock stays held
+_leader_lock_file = None
+
+# Monotonic start time of each running job, keyed by job id
+_job_started: dict[str, float] = {}
+
+
+def _on_job_event(event) -> None:
+    """Log each job's outcome and duration in one greppable key=value line."""
+    if event.code == EVENT_JOB_SUBMITTED:
+        _job_started[event.job_id] = time.monotonic()
+        return
+
+    started = _job_started.pop(event.job_id, None)
+    duration = time.monotonic() - started if started is not None else float("nan")
+    status = "error" if event.code == EVENT_JOB_ERROR else "ok"
+    logger.info(f"Scheduler: job={event.job_id} status={status} duration_s={duration:.2f}")
+
+
+def _retry_transient(job):
+    """Re-run a coroutine after transient database errors, backing off exponentially with jitter."""
+    @functools.wraps(job)
+    async def wrapper(*args, **kwargs):
+        for attempt in range(1, JOB_RETRY_ATTEMPTS + 1):
+            try:
+                return await job(*args, **kwargs)
+            except OperationalError as e:
+                if attempt == JOB_RETRY_ATTEMPTS:
+                    raise
+                delay = JOB_RETRY_BASE_DELAY * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"Scheduler: {job.__name__} failed ({e.orig}), "
+                    f"retrying in {delay:.1f}s (attempt {attempt}/{JOB_RETRY_ATTEMPTS})"
+                )
+                await asyncio.sleep(delay)
+
+    return wrapper
+
+
+@_retry_transient
+async def _store_fetched(articles: list[dict]) -> int:
+    """Store fetched articles, in a fresh session on each attempt."""
+    async with async_session() as session:
+        return await store_articles(articles, session)
+
 
 async def scheduled_fetch() -> None:
     """Fetch articles from RSS sources on schedule."""
     logger.info("Scheduler: Starting scheduled fetch")
-    async with async_session() as session:
-        result = await fetch_and_store(session)
-        logger.info(
-            f"Scheduler: Fetch complete - fetched {result['fetched']}, new {result['new']}"
+    # Fetch once and retry only the store: re-fetching would spend source API
+    # quota (TheNewsAPI allows 3 calls a day) and re-scrape og:image pages
+    articles = await fetch_all_sources()
+    new_count = await _store_fetched(articles)
+    logger.info(f"Scheduler: Fetch complete - fetched {len(articles)}, new {new_count}")
+
+
+async def _delete_older_than(session, model, primary_key, column, cutoff: datetime) -> int:
+    """Delete rows whose column is before the cutoff in primary-key chunks, committing each chunk."""
+    deleted = 0
+    while True:
+        chunk = select(primary_key).where(column < cutoff).limit(CLEANUP_CHUNK_SIZE)
+        result = await session.execute(
+            delete(model)
+            .where(primary_key.in_(chunk))
+            .execution_options(synchronize_session=False)
         )
+        await session.commit()
+        deleted += result.rowcount
+        if result.rowcount < CLEANUP_CHUNK_SIZE:
+            return deleted
 
 
+@_retry_transient
 async def cleanup_old_articles() -> None:
-    """Delete articles older than 14 days."""
+    """Delete articles older than the retention period."""
     logger.info("Scheduler: Starting cleanup of old articles")
-    cutoff_date = datetime.utcnow() - timedelta(days=14)
+    # Naive UTC, like the stored published_at/created_at values
+    cutoff_date = datetime.utcnow() - RETENTION
 
     async with async_session() as session:
-        result = await session.execute(
-            delete(Article).where(Article.published_at < cutoff_date)
+        deleted_count = await _delete_older_than(
+            session, Article, Article.id, Article.published_at, cutoff_date
+        )
+        invalidate_cache()
+        # Cached ratings are only useful while the article could still show up
+        cache_deleted = await _delete_older_than(
+            session, RatingCache, RatingCache.key, RatingCache.created_at, cutoff_date
+        )
+        logger.info(
+            f"Scheduler: Cleanup complete - deleted {deleted_count} old articles, "
+            f"{cache_deleted} cached ratings"
         )
-        await session.commit()
-        deleted_count = result.rowcount
-        logger.info(f"Scheduler: Cleanup complete - deleted {deleted_count} old articles")
 
 
 async def retry_failed_ratings() -> None:
@@ -56,12 +156,12 @@ async def retry_failed_ratings() -> None:
     logger.info(f"Scheduler: Starting retry of failed ratings ({remaining} API calls remaining)")
 
     async with async_session() as session:
-        # Get unrated articles
+        # Get unrated articles, a whole number of rating batches at a time
         result = await session.execute(
             select(Article)
             .where(Article.rating_failed == True)
             .order_by(Article.published_at.desc())
-            .limit(50)
+            .limit(ARTICLES_PER_BATCH * RETRY_BATCHES_PER_RUN)
         )
         pending_articles = result.scalars().all()
 
@@ -95,6 +195,7 @@ async def retry_failed_ratings() -> None:
 
         if not passed_filter:
             await session.commit()
+            invalidate_cache()
             logger.info("Scheduler: No articles passed pre-filter")
             return
 
@@ -118,92 +219,150 @@ async def retry_failed_ratings() -> None:
 
         if not articles_to_rate:
             await session.commit()
+            invalidate_cache()
             return
 
         sources = set(a.source_name for a in articles_to_rate)
         logger.info(f"Scheduler: Rating up to {len(articles_to_rate)} articles from {len(sources)} sources")
 
-        # Rate articles in batches (multiple articles per API call)
-        success_count = 0
-        for batch_start in range(0, len(articles_to_rate), ARTICLES_PER_BATCH):
-            if not rater.can_rate():
-                logger.info(f"Scheduler: Daily limit reached after {success_count} ratings")
-                break
-
-            batch = articles_to_rate[batch_start:batch_start + ARTICLES_PER_BATCH]
-            batch_input = [
+        # Rate articles in batches (multiple articles per API call), only as
+        # many as today's remaining quota covers
+        batches = [
+            articles_to_rate[i:i + ARTICLES_PER_BATCH]
+            for i in range(0, len(articles_to_rate), ARTICLES_PER_BATCH)
+        ][:rater.get_remaining_requests()]
+
+        # Send batches concurrently; the rater spaces them to the per-minute limit
+        logger.info(f"Scheduler: Batch rating {sum(len(b) for b in batches)} articles in {len(batches)} API calls")
+        batch_ratings = await asyncio.gather(*(
+            rater.rate_articles_batch([
                 {"title": a.headline, "summary": a.summary or "No summary", "source": a.source_name}
                 for a in batch
-            ]
-
-            logger.info(f"Scheduler: Batch rating {len(batch)} articles")
-            ratings = await rater.rate_articles_batch(batch_input)
+            ])
+            for batch in batches
+        ))
 
+        success_count = 0
+        rating_updates = []
+        for batch, ratings in zip(batches, batch_ratings):
             for article, rating in zip(batch, ratings):
                 score = rating.get("score")
                 if score is not None:
-                    article.hopefulness_score = score
-                    article.excluded_reason = rating.get("excluded_reason")
-                    article.is_rated = True
-                    article.rating_failed = False
+                    rating_updates.append({
+                        "id": article.id,
+                        "hopefulness_score": score,
+                        "excluded_reason": rating.get("excluded_reason"),
+                        "is_rated": True,
+                        "rating_failed": False,
+                    })
                     success_count += 1
                     logger.debug(f"Rated '{article.headline[:30]}': {score}")
 
-            # Delay between batches to respect RPM limit (5 req/min)
-            if batch_start + ARTICLES_PER_BATCH < len(articles_to_rate):
-                await asyncio.sleep(15)
-
+        # Apply all ratings as one executemany UPDATE by primary key
+        if rating_updates:
+            await session.execute(update(Article), rating_updates)
         await session.commit()
+        invalidate_cache()
         logger.info(
             f"Scheduler: Retry complete - {success_count} rated, {filtered_count} pre-filtered"
         )
 
 
+def _acquire_scheduler_lock() -> bool:
+    """Try to become the one worker process on this host that runs scheduled jobs."""
+    global _leader_lock_file
+    if fcntl is None:
+        return True
+
+    lock_file = open(settings.SCHEDULER_LOCK_FILE, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+    _leader_lock_file = lock_file
+    return True
+
+
 def start_scheduler() -> None:
     """Start the scheduler with configured jobs."""
+    # Every gunicorn worker runs the lifespan; without this each of them would
+    # fetch, rate (against its own copy of the daily Gemini quota) and clean up
+    if not _acquire_scheduler_lock():
+        logger.info("Scheduler: another worker holds the scheduler lock, not running jobs here")
+        return
+
     # Run initial fetch immediately on startup
     scheduler.add_job(
         scheduled_fetch,
         id="initial_fetch",
         name="Initial fetch on startup",
         replace_existing=True,
+        misfire_grace_time=60,
     )
 
-    # Add recurring fetch job
+    # Add recurring fetch job; a run that overlaps or backs up behind a slow
+    # fetch is folded into one instead of piling up
     scheduler.add_job(
         scheduled_fetch,
         trigger=IntervalTrigger(hours=settings.FETCH_INTERVAL_HOURS),
         id="fetch_articles",
         name="Fetch articles from RSS sources",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=60,
     )
 
-    # Add cleanup job - run daily
+    # Add cleanup job - run daily at a fixed off-peak hour rather than 24h
+    # after whenever the process last restarted
     scheduler.add_job(
         cleanup_old_articles,
-        trigger=IntervalTrigger(hours=24),
+        trigger=CronTrigger(hour=settings.CLEANUP_HOUR_UTC, minute=0, timezone="UTC"),
         id="cleanup_articles",
-        name="Delete articles older than 14 days",
+        name=f"Delete articles older than {settings.RETENTION_DAYS} days",
         replace_existing=True,
+        misfire_grace_time=3600,
     )
 
-    # Add retry job for failed ratings - run every hour to use up daily quota
+    # Add retry job for failed ratings - run every hour to use up daily quota,
+    # half an hour out of phase with the fetch job
     scheduler.add_job(
         retry_failed_ratings,
-        trigger=IntervalTrigger(hours=1),
+        trigger=IntervalTrigger(
+            hours=1, start_date=datetime.now(timezone.utc) + RETRY_START_OFFSET
+        ),
         id="retry_ratings",
         name="Retry failed article ratings",
         replace_existing=True,
     )
 
+    scheduler.add_listener(_on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
     scheduler.start()
     logger.info(
         f"Scheduler started: fetching every {settings.FETCH_INTERVAL_HOURS} hours, "
-        "retry ratings every hour, cleanup daily"
+        f"retry ratings every hour, cleanup daily at {settings.CLEANUP_HOUR_UTC:02d}:00 UTC"
     )
 
 
-def shutdown_scheduler() -> None:
-    """Shutdown the scheduler gracefully."""
+async def shutdown_scheduler() -> None:
+    """Shutdown the scheduler, giving running jobs a bounded time to finish."""
+    if not scheduler.running:
+        return
+
+    # The asyncio executor cancels running jobs on shutdown whatever `wait`
+    # says, so drain them here first; pausing stops new runs from starting
+    scheduler.pause()
+    if _job_started:
+        logger.info(
+            f"Scheduler: waiting up to {settings.SHUTDOWN_TIMEOUT_SECONDS}s for running jobs: "
+            f"{', '.join(sorted(_job_started))}"
+        )
+        deadline = time.monotonic() + settings.SHUTDOWN_TIMEOUT_SECONDS
+        while _job_started and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if _job_started:
+            logger.warning(f"Scheduler: cancelling unfinished jobs: {', '.join(sorted(_job_started))}")
+
     scheduler.shutdown(wait=False)
     logger.info("Scheduler shutdown complete")